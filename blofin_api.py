@@ -1,103 +1,343 @@
 import hmac
 import hashlib
 import time
+import asyncio
+import threading
+import weakref
+import aiohttp
 import requests
-import json
+import orjson
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import ConnectTimeoutError
 from urllib3.util.retry import Retry
 import socket
 
-class BlofinAPI:
+# Seconds a fetched ticker price is reused before polling the API again
+TICKER_CACHE_TTL = 0.3
+
+# Seconds between background re-resolutions of the API hostname
+DNS_REFRESH_INTERVAL = 300
+
+# Seconds a pre-resolved address that refused or timed out a connect is skipped
+FAILED_ADDRESS_COOLDOWN = DNS_REFRESH_INTERVAL
+
+# Seconds an idle keep-alive connection stays in the aiohttp pool; the bot is idle for most of each candle
+KEEPALIVE_TIMEOUT = 75
+
+# Transient HTTP statuses retried with exponential backoff (RETRY_BACKOFF * 2**attempt seconds)
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1
+
+# Pre-serialized request bodies for the fixed-schema trading endpoints, keyed by (has_tp, has_sl).
+# Byte-for-byte identical to orjson.dumps of the equivalent dict; instId is filled with an
+# already JSON-encoded string, the remaining fields are plain str values.
+_ORDER_BASE = b'{"instId":%s,"tdMode":"isolated","side":"%s","ordType":"market","sz":"%s"'
+_ORDER_TEMPLATES = {
+    (False, False): _ORDER_BASE + b'}',
+    (True, False): _ORDER_BASE + b',"tpTriggerPrice":"%s","tpOrderPrice":"-1"}',
+    (False, True): _ORDER_BASE + b',"slTriggerPrice":"%s","slOrderPrice":"-1"}',
+    (True, True): _ORDER_BASE + b',"tpTriggerPrice":"%s","tpOrderPrice":"-1","slTriggerPrice":"%s","slOrderPrice":"-1"}'
+}
+_LEVERAGE_TEMPLATE = b'{"instId":%s,"lever":"%s"}'
+
+# urllib3 already disables Nagle (TCP_NODELAY); also keep idle pooled connections probed by the kernel
+_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+# Endpoints the bot calls; their full URLs and signing paths are built once per client
+KNOWN_ENDPOINTS = ('/trade/order', '/account/set-leverage', '/market/ticker', '/api/v1/market/candles')
+
+
+def _connect_failed(error: requests.exceptions.ConnectionError) -> bool:
+    """True if the connection itself failed, i.e. nothing was sent and the request can go elsewhere"""
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    # NewConnectionError (refused, unreachable) subclasses ConnectTimeoutError
+    return isinstance(reason, ConnectTimeoutError)
+
+
+class _HostResolver:
+    """Resolves one hostname up front and keeps its IPv4 addresses fresh from a daemon thread until closed"""
+
+    def __init__(self, host: str, port: int, refresh_interval: float = DNS_REFRESH_INTERVAL):
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        self.logger = logging.getLogger(__name__)
+        self._host_ips: List[str] = []
+        self._failed: Dict[str, float] = {}  # address -> monotonic time its connect failed
+        self._stop = threading.Event()
+        self.refresh()
+        threading.Thread(target=self._refresh_loop, name=f"dns-{host}", daemon=True).start()
+
+    def refresh(self) -> None:
+        """Re-resolve the host, keeping the previous addresses if the lookup fails"""
+        try:
+            # IPv4 only, so connects never wait on a Happy Eyeballs fallback
+            infos = socket.getaddrinfo(self.host, self.port, socket.AF_INET, socket.SOCK_STREAM)
+            self._host_ips = [info[4][0] for info in infos]
+        except socket.gaierror as e:
+            self.logger.warning("DNS pre-resolution failed for %s: %s", self.host, e)
+
+    def address(self) -> Optional[str]:
+        """First resolved address that hasn't recently failed, or None to fall back to regular resolution"""
+        now = time.monotonic()
+        failed = self._failed
+        for ip in self._host_ips:
+            failed_at = failed.get(ip)
+            if failed_at is None or now - failed_at >= FAILED_ADDRESS_COOLDOWN:
+                return ip
+        return None
+
+    def mark_failed(self, address: str) -> None:
+        """Skip an address for FAILED_ADDRESS_COOLDOWN after a failed connect"""
+        self.logger.warning("Connect to %s (%s) failed, trying the next address", address, self.host)
+        self._failed[address] = time.monotonic()
+
+    def close(self) -> None:
+        """Stop the refresh thread"""
+        self._stop.set()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+
+class _PinnedHostAdapter(HTTPAdapter):
+    """HTTPAdapter that connects to pre-resolved addresses while TLS still verifies the hostname"""
+
+    def __init__(self, resolver: _HostResolver, **kwargs):
+        self.resolver = resolver
+        # Address the current thread's request was pinned to, so send blames the one actually dialed
+        self._pinned = threading.local()
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault('socket_options', _SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        address = self.resolver.address() if host_params['host'] == self.resolver.host else None
+        self._pinned.address = address
+        if address:
+            host_params['host'] = address
+            if host_params['scheme'] == 'https':
+                # SNI and certificate matching keep using the real hostname
+                pool_kwargs['server_hostname'] = self.resolver.host
+                pool_kwargs['assert_hostname'] = self.resolver.host
+        return host_params, pool_kwargs
+
+    def send(self, request, **kwargs):
+        # Walk the pre-resolved addresses on connect failures, ending with the hostname itself,
+        # like urllib3's create_connection does over all getaddrinfo results
+        while True:
+            self._pinned.address = None
+            try:
+                return super().send(request, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                address = self._pinned.address
+                if address is None or not _connect_failed(e):
+                    raise
+                self.resolver.mark_failed(address)
+
+    def add_headers(self, request, **kwargs):
+        # The connection targets an IP, so the Host header has to name the server explicitly
+        url = urlparse(request.url)
+        if url.hostname == self.resolver.host:
+            request.headers.setdefault('Host', url.netloc)
+
+
+def _close_session(session: requests.Session, resolver: _HostResolver) -> None:
+    session.close()
+    resolver.close()
+
+
+class _BlofinAPIBase:
+    """Credentials, endpoint URLs, signing and payload building shared by the sync and async clients"""
+
     def __init__(self, api_key: str, api_secret: str, base_url: str, password: str):
         self.api_key = api_key
         self.api_secret = api_secret
+        self._secret_bytes = api_secret.encode('utf-8') if api_secret else b''
         self.password = password
         self.base_url = base_url.rstrip('/')  # Remove trailing slash if present
-        self.session = self._create_session()
+        self._urls: Dict[str, Tuple[str, bytes]] = {}  # endpoint -> (url, encoded signing path)
+        for endpoint in KNOWN_ENDPOINTS:
+            self._add_endpoint(endpoint)
         self.logger = logging.getLogger(__name__)
+        self._ticker_cache: Dict[str, Tuple[float, float]] = {}  # symbol -> (fetched_at, price)
+
+    def _static_headers(self) -> Dict[str, str]:
+        """Headers that are identical on every request"""
+        headers = {
+            'BF-API-KEY': self.api_key,
+            'BF-API-PASSPHRASE': self.password,
+            'Content-Type': 'application/json'
+        }
+        return {key: value for key, value in headers.items() if value is not None}
+
+    def _generate_signature(self, timestamp: bytes, method: bytes, request_path: bytes, body: bytes = b'') -> str:
+        """Generate signature for API request from pre-encoded message parts"""
+        # One-shot HMAC goes straight to OpenSSL instead of building an hmac.HMAC object
+        return hmac.digest(self._secret_bytes, b''.join((timestamp, method, request_path, body)), 'sha256').hex()
+
+    def _add_endpoint(self, endpoint: str) -> Tuple[str, bytes]:
+        """Normalize endpoint once and memoize its full URL and encoded signing path"""
+        path = endpoint if endpoint.startswith('/') else '/' + endpoint
+        target = self._urls[endpoint] = (f"{self.base_url}{path}", path.encode('ascii'))
+        return target
+
+    def _auth_headers(self, method: str, request_path: bytes, body: bytes) -> Dict[str, str]:
+        """Per-request timestamp and signature headers"""
+        timestamp = str(int(time.time() * 1000))
+        return {
+            'BF-API-TIMESTAMP': timestamp,
+            'BF-API-SIGN': self._generate_signature(
+                timestamp.encode('ascii'),
+                method.upper().encode('ascii'),
+                request_path,
+                body
+            )
+        }
+
+    def _prepare_request(self, method: str, endpoint: str, params: Optional[Dict], data: Optional[Dict],
+                         body: Optional[bytes]) -> Tuple[str, Dict[str, str], bytes]:
+        """Resolve the URL, serialize the body and sign it; returns (url, headers, body)"""
+        target = self._urls.get(endpoint)
+        if target is None:
+            target = self._add_endpoint(endpoint)
+        url, request_path = target
+
+        # Sign and send the exact same serialized bytes; callers may pass a pre-built body
+        if body is None:
+            body = orjson.dumps(data) if data else b''
+        headers = self._auth_headers(method, request_path, body)
+
+        # Avoid stringifying headers/params/body on every call unless DEBUG is on
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Making %s request to %s", method, url)
+            self.logger.debug("Headers: %s", headers)
+            self.logger.debug("Params: %s", params)
+            self.logger.debug("Body: %s", body)
+
+        return url, headers, body
+
+    @staticmethod
+    def _order_body(symbol: str, side: str, size: float,
+                    take_profit: Optional[float], stop_loss: Optional[float]) -> bytes:
+        """Serialize the market order payload with optional TP/SL from a precompiled template"""
+        template = _ORDER_TEMPLATES[take_profit is not None, stop_loss is not None]
+        values = [orjson.dumps(symbol), side.encode(), str(size).encode()]
+        if take_profit is not None:
+            values.append(str(take_profit).encode())
+        if stop_loss is not None:
+            values.append(str(stop_loss).encode())
+        return template % tuple(values)
+
+    @staticmethod
+    def _leverage_body(symbol: str, leverage: int) -> bytes:
+        """Serialize the set-leverage payload from a precompiled template"""
+        return _LEVERAGE_TEMPLATE % (orjson.dumps(symbol), str(leverage).encode())
+
+    def _cached_ticker_price(self, symbol: str, now: float) -> Optional[float]:
+        """Return the cached price for symbol if it is younger than TICKER_CACHE_TTL"""
+        fetched_at, price = self._ticker_cache.get(symbol, (0.0, 0.0))
+        if price and now - fetched_at < TICKER_CACHE_TTL:
+            return price
+        return None
+
+    def _store_ticker_price(self, symbol: str, response: Dict, fetched_at: float) -> float:
+        """Extract the last price from a ticker response and cache it"""
+        if not response or 'data' not in response:
+            raise ValueError(f"Invalid response format from API: {response}")
+
+        data = response['data']
+        if not isinstance(data, list) or len(data) == 0:
+            raise ValueError(f"No ticker data received for {symbol}")
+
+        ticker_data = data[0]
+        price = ticker_data.get('last')
+        if not price:
+            raise ValueError(f"No price data found for {symbol}")
+
+        price = float(price)
+        self._ticker_cache[symbol] = (fetched_at, price)
+        return price
+
+
+class BlofinAPI(_BlofinAPIBase):
+    def __init__(self, api_key: str, api_secret: str, base_url: str, password: str):
+        super().__init__(api_key, api_secret, base_url, password)
+        self.session = self._create_session()
+
+    def close(self) -> None:
+        """Close the session and stop its DNS refresh thread; also runs when the client is garbage collected"""
+        self._finalizer()
 
     def _create_session(self):
         """Create session with custom retry strategy"""
         session = requests.Session()
 
         retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[408, 429, 500, 502, 503, 504],
+            total=MAX_RETRIES,
+            backoff_factor=RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
             allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE", "POST"],
             raise_on_status=True
         )
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # Resolve the API host once at startup instead of on every new connection
+        parsed_url = urlparse(self.base_url)
+        resolver = _HostResolver(parsed_url.hostname, parsed_url.port or (443 if parsed_url.scheme == 'https' else 80))
+        # The finalizer must not reference self, or the client could never be collected
+        self._finalizer = weakref.finalize(self, _close_session, session, resolver)
+
+        # Single host, so one pool is enough; size it for bursts of concurrent calls
+        adapter = _PinnedHostAdapter(
+            resolver,
+            pool_connections=1,
+            pool_maxsize=32,
+            pool_block=False,
+            max_retries=retry_strategy
+        )
         session.mount("http://", adapter)
         session.mount("https://", adapter)
-        return session
-
-    def _generate_signature(self, timestamp: str, method: str, request_path: str, body: str = '') -> str:
-        """Generate signature for API request"""
-        message = str(timestamp) + method.upper() + request_path
-        if body:
-            message += body
 
-        mac = hmac.new(
-            bytes(self.api_secret, encoding='utf8'),
-            bytes(message, encoding='utf-8'),
-            digestmod='sha256'
-        )
-        return mac.hexdigest()
+        # Static auth headers are set once; _request only adds timestamp and signature
+        session.headers.update(self._static_headers())
+        return session
 
-    def _request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None) -> Dict:
+    def _request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None,
+                 body: Optional[bytes] = None) -> Dict:
         """Make API request with authentication and improved error handling"""
-        if not endpoint.startswith('/'):
-            endpoint = '/' + endpoint
-
-        url = f"{self.base_url}{endpoint}"
-        timestamp = str(int(time.time() * 1000))
-
-        headers = {
-            'BF-API-KEY': self.api_key,
-            'BF-API-TIMESTAMP': timestamp,
-            'BF-API-SIGN': '',
-            'Content-Type': 'application/json',
-            'BF-API-PASSPHRASE': self.password
-        }
-
-        body = ''
-        if data:
-            body = json.dumps(data)
+        url, headers, body = self._prepare_request(method, endpoint, params, data, body)
 
         try:
-            signature = self._generate_signature(timestamp, method, endpoint, body)
-            headers['BF-API-SIGN'] = signature
-
-            self.logger.debug(f"Making {method} request to {url}")
-            self.logger.debug(f"Headers: {headers}")
-            self.logger.debug(f"Params: {params}")
-            self.logger.debug(f"Body: {body}")
-
             response = self.session.request(
                 method=method,
                 url=url,
                 headers=headers,
                 params=params,
-                json=data if data else None,
+                data=body if body else None,
                 timeout=30
             )
 
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
 
         except requests.exceptions.ConnectionError as e:
             if isinstance(e.args[0], socket.gaierror):
-                self.logger.error(f"DNS resolution failed for {url}: {str(e)}")
+                self.logger.error("DNS resolution failed for %s: %s", url, e)
                 raise ValueError(f"Could not connect to Blofin API. Please check your internet connection and try again.")
             raise
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"API request failed: {str(e)}")
+            self.logger.error("API request failed: %s", e)
             if hasattr(e, 'response') and e.response is not None:
-                self.logger.error(f"Response text: {e.response.text}")
+                self.logger.error("Response text: %s", e.response.text)
             raise
 
     def place_order(self, symbol: str, side: str, size: float, 
@@ -110,31 +350,10 @@ class BlofinAPI:
             self.set_leverage(symbol, leverage)
 
             endpoint = "/trade/order"
+            body = self._order_body(symbol, side, size, take_profit, stop_loss)
 
-            # Base order data
-            data = {
-                "instId": symbol,
-                "tdMode": "isolated",  # Use isolated margin mode
-                "side": side,
-                "ordType": "market",
-                "sz": str(size)
-            }
-
-            # Add take profit and stop loss if provided
-            if take_profit is not None:
-                data.update({
-                    "tpTriggerPrice": str(take_profit),
-                    "tpOrderPrice": "-1"  # Market price execution for TP
-                })
-
-            if stop_loss is not None:
-                data.update({
-                    "slTriggerPrice": str(stop_loss),
-                    "slOrderPrice": "-1"  # Market price execution for SL
-                })
-
-            self.logger.info(f"Placing order with data: {data}")
-            return self._request('POST', endpoint, data=data)
+            self.logger.info("Placing order with data: %s", body.decode())
+            return self._request('POST', endpoint, body=body)
 
         except Exception as e:
             self.logger.error(f"Failed to place order for {symbol}: {str(e)}")
@@ -144,36 +363,146 @@ class BlofinAPI:
         """Set leverage for a symbol"""
         try:
             endpoint = "/account/set-leverage"
-            data = {
-                "instId": symbol,
-                "lever": str(leverage)
-            }
-            return self._request('POST', endpoint, data=data)
+            return self._request('POST', endpoint, body=self._leverage_body(symbol, leverage))
         except Exception as e:
             self.logger.error(f"Failed to set leverage for {symbol}: {str(e)}")
             raise
 
     def get_ticker_price(self, symbol: str) -> float:
-        """Get current price for a symbol"""
+        """Get current price for a symbol, reusing a price fetched within TICKER_CACHE_TTL"""
+        now = time.monotonic()
+        cached_price = self._cached_ticker_price(symbol, now)
+        if cached_price is not None:
+            return cached_price
+
         try:
             endpoint = "/market/ticker"
             params = {"instId": symbol}
             response = self._request('GET', endpoint, params=params)
+            return self._store_ticker_price(symbol, response, now)
+
+        except Exception as e:
+            self.logger.error(f"Failed to get ticker price for {symbol}: {str(e)}")
+            raise
+
+
+class AsyncBlofinAPI(_BlofinAPIBase):
+    """asyncio client sharing one aiohttp keep-alive pool, so many symbols can be polled concurrently"""
+
+    def __init__(self, api_key: str, api_secret: str, base_url: str, password: str):
+        super().__init__(api_key, api_secret, base_url, password)
+        # aiohttp sessions must be created inside the running event loop, see _get_session
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared aiohttp session, creating it on first use"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=DNS_REFRESH_INTERVAL,
+                                               keepalive_timeout=KEEPALIVE_TIMEOUT),
+                headers=self._static_headers(),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self.session
 
-            if not response or 'data' not in response:
-                raise ValueError(f"Invalid response format from API: {response}")
+    async def close(self) -> None:
+        """Close the underlying aiohttp session"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
 
-            data = response['data']
-            if not isinstance(data, list) or len(data) == 0:
-                raise ValueError(f"No ticker data received for {symbol}")
+    async def __aenter__(self) -> 'AsyncBlofinAPI':
+        await self._get_session()
+        return self
 
-            ticker_data = data[0]
-            price = ticker_data.get('last')
-            if not price:
-                raise ValueError(f"No price data found for {symbol}")
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
 
-            return float(price)
+    async def _request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None,
+                       body: Optional[bytes] = None) -> Dict:
+        """
+        Make API request with authentication and improved error handling.
+        GETs are retried on RETRY_STATUSES like the sync client; POSTs (orders, leverage) are sent once.
+        """
+        attempts = MAX_RETRIES + 1 if method == 'GET' else 1
+        for attempt in range(attempts):
+            # Signed per attempt, since the timestamp is part of the signature
+            url, headers, body = self._prepare_request(method, endpoint, params, data, body)
+
+            try:
+                session = await self._get_session()
+                async with session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    data=body if body else None
+                ) as response:
+                    content = await response.read()
+                    if response.status not in RETRY_STATUSES or attempt == attempts - 1:
+                        if response.status >= 400:
+                            self.logger.error("Response text: %s", content.decode('utf-8', 'replace'))
+                        response.raise_for_status()
+                        return orjson.loads(content)
+
+            except aiohttp.ClientConnectorError as e:
+                if isinstance(e.os_error, socket.gaierror):
+                    self.logger.error("DNS resolution failed for %s: %s", url, e)
+                    raise ValueError(f"Could not connect to Blofin API. Please check your internet connection and try again.")
+                raise
+            except aiohttp.ClientError as e:
+                self.logger.error("API request failed: %s", e)
+                raise
+
+            delay = RETRY_BACKOFF * 2 ** attempt
+            self.logger.warning("%s %s returned %s, retrying in %ss", method, url, response.status, delay)
+            await asyncio.sleep(delay)
+
+    async def place_order(self, symbol: str, side: str, size: float,
+                          take_profit: Optional[float] = None,
+                          stop_loss: Optional[float] = None,
+                          leverage: int = 1) -> Dict:
+        """Place a new order with optional TP/SL"""
+        try:
+            # First, set the leverage
+            await self.set_leverage(symbol, leverage)
+
+            endpoint = "/trade/order"
+            body = self._order_body(symbol, side, size, take_profit, stop_loss)
+
+            self.logger.info("Placing order with data: %s", body.decode())
+            return await self._request('POST', endpoint, body=body)
+
+        except Exception as e:
+            self.logger.error(f"Failed to place order for {symbol}: {str(e)}")
+            raise
+
+    async def set_leverage(self, symbol: str, leverage: int) -> Dict:
+        """Set leverage for a symbol"""
+        try:
+            endpoint = "/account/set-leverage"
+            return await self._request('POST', endpoint, body=self._leverage_body(symbol, leverage))
+        except Exception as e:
+            self.logger.error(f"Failed to set leverage for {symbol}: {str(e)}")
+            raise
+
+    async def get_ticker_price(self, symbol: str) -> float:
+        """Get current price for a symbol, reusing a price fetched within TICKER_CACHE_TTL"""
+        now = time.monotonic()
+        cached_price = self._cached_ticker_price(symbol, now)
+        if cached_price is not None:
+            return cached_price
+
+        try:
+            endpoint = "/market/ticker"
+            params = {"instId": symbol}
+            response = await self._request('GET', endpoint, params=params)
+            return self._store_ticker_price(symbol, response, now)
 
         except Exception as e:
             self.logger.error(f"Failed to get ticker price for {symbol}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    async def get_ticker_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Fetch prices for several symbols concurrently over the shared connection pool"""
+        prices = await asyncio.gather(*(self.get_ticker_price(symbol) for symbol in symbols))
+        return dict(zip(symbols, prices))
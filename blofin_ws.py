@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import socket
+from collections import deque
+from typing import List, Optional
+
+import aiohttp
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Public WebSocket endpoint for demo trading (see blofin_api_doc.md)
+DEMO_PUBLIC_WS_URL = "wss://demo-trading-openapi.blofin.com/ws/public"
+
+# Blofin drops connections that stay silent for 30 seconds, so ping before that
+PING_INTERVAL = 25
+MAX_RECONNECT_DELAY = 30
+
+class BlofinWSClient:
+    def __init__(self,
+                 symbol: str,
+                 channel: str = "candle5m",
+                 url: str = DEMO_PUBLIC_WS_URL,
+                 maxlen: int = 300):
+        """Keep a rolling window of candles for one symbol, fed by a public WebSocket subscription."""
+        self.symbol = symbol
+        self.channel = channel
+        self.url = url
+        self.candles = deque(maxlen=maxlen)
+        self.candle_event = asyncio.Event()
+        self.running = False
+
+    def seed(self, rows: List[List[str]]) -> None:
+        """Fill the window from a REST backfill (rows in any order)."""
+        self.candles.clear()
+        self.candles.extend(sorted(rows, key=lambda row: int(row[0])))
+
+    async def next_candle(self, timeout: Optional[float] = None) -> List[List[str]]:
+        """
+        Wait until a new candle opens and return the window, oldest first.
+        The last row is the freshly opened candle and the one before it has just closed,
+        the same view a REST candles request returns right after the boundary.
+        """
+        await asyncio.wait_for(self.candle_event.wait(), timeout)
+        self.candle_event.clear()
+        return list(self.candles)
+
+    def _on_candle(self, row: List[str]) -> None:
+        """Merge one pushed candle into the window."""
+        candles = self.candles
+        ts = int(row[0])
+        last_ts = int(candles[-1][0]) if candles else None
+
+        if ts == last_ts:
+            # Update of the in-progress candle
+            candles[-1] = row
+        elif last_ts is None or ts > last_ts:
+            # A new candle opened, so the previous one is final
+            candles.append(row)
+            self.candle_event.set()
+
+    async def run(self) -> None:
+        """Stay subscribed to the candle channel, reconnecting with backoff on failure."""
+        self.running = True
+        delay = 1
+        subscribe = orjson.dumps({
+            "op": "subscribe",
+            "args": [{"channel": self.channel, "instId": self.symbol}]
+        }).decode()
+
+        async with aiohttp.ClientSession() as session:
+            while self.running:
+                try:
+                    async with session.ws_connect(self.url) as ws:
+                        # aiohttp already sets TCP_NODELAY; let the kernel also probe this long-lived connection
+                        sock = ws.get_extra_info('socket')
+                        if sock is not None:
+                            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+                        await ws.send_str(subscribe)
+                        logger.info("Subscribed to %s %s", self.channel, self.symbol)
+                        delay = 1
+                        await self._receive(ws)
+
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("WebSocket error: %s", e)
+
+                if self.running:
+                    logger.warning("WebSocket disconnected, reconnecting in %ss", delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _receive(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Dispatch pushed messages until the connection closes or a ping goes unanswered."""
+        awaiting_pong = False
+        while self.running:
+            try:
+                msg = await ws.receive(timeout=PING_INTERVAL)
+            except asyncio.TimeoutError:
+                if awaiting_pong:
+                    # Nothing came back for a whole interval after the ping: treat the connection as dead
+                    logger.warning("No pong within %ss, reconnecting", PING_INTERVAL)
+                    return
+                await ws.send_str("ping")
+                awaiting_pong = True
+                continue
+
+            # Any message proves the connection is alive, not only the pong
+            awaiting_pong = False
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                return
+            if msg.data == "pong":
+                continue
+
+            message = orjson.loads(msg.data)
+            if message.get("event") == "error":
+                logger.error("WebSocket subscription error: %s", message.get("msg"))
+                continue
+
+            for row in message.get("data", ()):
+                self._on_candle(row)
+
+    def stop(self) -> None:
+        """Stop reconnecting; the receive loop exits on its next message or ping."""
+        self.running = False
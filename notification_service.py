@@ -1,10 +1,16 @@
 import os
+import time
+import atexit
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from twilio.rest import Client
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Delivery attempts per message made by the background worker
+SEND_ATTEMPTS = 3
+
 class NotificationService:
     def __init__(self):
         """Initialize Twilio client for notifications."""
@@ -17,6 +23,9 @@ class NotificationService:
             
             if all([self.account_sid, self.auth_token, self.from_number, self.to_number]):
                 self.client = Client(self.account_sid, self.auth_token)
+                # Twilio calls run on a background worker so signals never wait on SMS delivery
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sms')
+                atexit.register(self._executor.shutdown)
                 self.enabled = True
                 logger.info("SMS notifications enabled")
             else:
@@ -26,28 +35,38 @@ class NotificationService:
             logger.error(f"Failed to initialize notification service: {str(e)}")
             self.enabled = False
 
-    def send_notification(self, message: str) -> bool:
-        """Send SMS notification."""
+    def send_notification(self, message: str) -> Future:
+        """Queue SMS notification; the returned Future resolves to whether it was sent."""
         if not self.enabled:
             logger.warning("Notification service is not enabled")
-            return False
+            future = Future()
+            future.set_result(False)
+            return future
 
-        try:
-            self.client.messages.create(
-                body=message,
-                from_=self.from_number,
-                to=self.to_number
-            )
-            logger.info(f"SMS notification sent: {message}")
-            return True
-        
-        except Exception as e:
-            logger.error(f"Failed to send SMS notification: {str(e)}")
-            return False
+        return self._executor.submit(self._send_sync, message)
+
+    def _send_sync(self, message: str) -> bool:
+        """Send SMS notification, retrying transient failures."""
+        for attempt in range(1, SEND_ATTEMPTS + 1):
+            try:
+                self.client.messages.create(
+                    body=message,
+                    from_=self.from_number,
+                    to=self.to_number
+                )
+                logger.info(f"SMS notification sent: {message}")
+                return True
+
+            except Exception as e:
+                logger.error(f"Failed to send SMS notification (attempt {attempt}/{SEND_ATTEMPTS}): {str(e)}")
+                if attempt < SEND_ATTEMPTS:
+                    time.sleep(attempt)
+
+        return False
 
     def notify_signal(self, symbol: str, signal: str, price: float, 
                      tp_price: Optional[float] = None, 
-                     sl_price: Optional[float] = None) -> bool:
+                     sl_price: Optional[float] = None) -> Future:
         """Send notification for trading signal."""
         message = f"Trading Signal: {signal.upper()} {symbol} @ ${price:.2f}"
         if tp_price:
@@ -58,7 +77,7 @@ class NotificationService:
 
     def notify_position_closed(self, symbol: str, side: str, 
                              entry_price: float, exit_price: float, 
-                             pnl: float) -> bool:
+                             pnl: float) -> Future:
         """Send notification for position closure."""
         message = (
             f"Position Closed: {side.upper()} {symbol}\n"
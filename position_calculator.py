@@ -1,40 +1,55 @@
 import logging
-
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Tuple
 
-class PositionCalculator:
-    # Minimum amounts for different trading pairs
-    MIN_AMOUNTS = {
-        'BTC-USDT': 0.1,
-        'ETH-USDT': 1.0,  # Blofin minimum requirement
-        'DEFAULT': 1.0  # Conservative default
-    }
+# Minimum amounts for different trading pairs (read-only so cached sizes stay valid)
+MIN_AMOUNTS = MappingProxyType({
+    'BTC-USDT': 0.1,
+    'ETH-USDT': 1.0,  # Blofin minimum requirement
+    'DEFAULT': 1.0  # Conservative default
+})
+_DEFAULT_MIN_AMOUNT = MIN_AMOUNTS['DEFAULT']
 
-    @staticmethod
-    def get_minimum_amount(symbol: str) -> float:
-        """Get minimum position size for a trading pair"""
-        return PositionCalculator.MIN_AMOUNTS.get(symbol, PositionCalculator.MIN_AMOUNTS['DEFAULT'])
+# Percent-to-fraction factor, folded once at import time
+_PERCENT = 0.01
 
-    @staticmethod
-    def calculate_position_size(
-        price: float,
-        usd_size: float,
-        leverage: int,
-        symbol: str = 'BTC-USDT'
-    ) -> float:
-        """Calculate position size in coins based on USD amount"""
-        position_size = (usd_size * leverage) / price
-        min_amount = PositionCalculator.get_minimum_amount(symbol)
-
-        # Round to 4 decimal places for comparison
-        position_size = round(position_size, 4)
-
-        if position_size < min_amount:
-            # Adjust position size to minimum required
-            position_size = min_amount
-            logging.warning(f"Adjusted position size to minimum required amount ({min_amount}) for {symbol}")
-
-        return round(position_size, 8)
+def get_minimum_amount(symbol: str) -> float:
+    """Get minimum position size for a trading pair"""
+    return MIN_AMOUNTS.get(symbol, _DEFAULT_MIN_AMOUNT)
+
+@lru_cache(maxsize=1024)
+def _position_size(price: float, usd_size: float, leverage: int, symbol: str) -> Tuple[float, bool]:
+    """Memoized sizing; returns the size and whether it was raised to the minimum"""
+    position_size = (usd_size * leverage) / price
+    min_amount = get_minimum_amount(symbol)
+
+    # Round to 4 decimal places once; this is both the compared and the returned size
+    position_size = round(position_size, 4)
+
+    if position_size < min_amount:
+        # Adjust position size to minimum required
+        return min_amount, True
+
+    return position_size, False
+
+def calculate_position_size(
+    price: float,
+    usd_size: float,
+    leverage: int,
+    symbol: str = 'BTC-USDT'
+) -> float:
+    """Calculate position size in coins based on USD amount"""
+    position_size, adjusted = _position_size(price, usd_size, leverage, symbol)
+    if adjusted:
+        logging.warning(f"Adjusted position size to minimum required amount ({position_size}) for {symbol}")
+    return position_size
+
+class PositionCalculator:
+    MIN_AMOUNTS = MIN_AMOUNTS
+
+    get_minimum_amount = staticmethod(get_minimum_amount)
+    calculate_position_size = staticmethod(calculate_position_size)
 
     @staticmethod
     def calculate_tp_sl(
@@ -44,11 +59,9 @@ class PositionCalculator:
         sl_percentage: float
     ) -> Tuple[float, float]:
         """Calculate take profit and stop loss prices"""
-        if is_long:
-            tp_price = entry_price * (1 + tp_percentage / 100)
-            sl_price = entry_price * (1 - sl_percentage / 100)
-        else:
-            tp_price = entry_price * (1 - tp_percentage / 100)
-            sl_price = entry_price * (1 + sl_percentage / 100)
+        # TP moves with the position direction and SL against it
+        sign = 1.0 if is_long else -1.0
+        tp_price = entry_price * (1 + sign * tp_percentage * _PERCENT)
+        sl_price = entry_price * (1 - sign * sl_percentage * _PERCENT)
 
         return round(tp_price, 8), round(sl_price, 8)
\ No newline at end of file
@@ -1,11 +1,46 @@
 import logging
 import pandas as pd
 import numpy as np
+from collections import deque
 from typing import Dict, Optional, Tuple, List
-from datetime import datetime, timedelta
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# 5-minute timeframe, in nanoseconds to match pandas Timestamp.value
+CANDLE_INTERVAL_NS = 5 * 60 * 1_000_000_000
+
+# Smoothing factor of the EMA 34 (pandas ewm with span=34, adjust=False)
+EMA34_ALPHA = 2 / (34 + 1)
+
+SMA_WINDOW = 21
+
+# update_indicators calls between exact re-sums of the running SMA 21 sum, to shed float drift
+SMA_RESUM_INTERVAL = 10_000
+
+def band_indicators(close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    EMA 34, SMA 21 and the upper/lower bands of a close series, on plain float64 arrays.
+    SMA 21 and the bands are NaN for the first 20 closes.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+
+    ema = np.empty(n)
+    if n:
+        # ewm(adjust=False) recursion; a Python float loop beats pandas dispatch on a few hundred rows
+        value = float(close[0])
+        keep = 1 - EMA34_ALPHA
+        for i, x in enumerate(close.tolist()):
+            value = value * keep + x * EMA34_ALPHA
+            ema[i] = value
+
+    sma = np.full(n, np.nan)
+    if n >= SMA_WINDOW:
+        sma[SMA_WINDOW - 1:] = np.convolve(close, np.ones(SMA_WINDOW) / SMA_WINDOW, mode='valid')
+
+    return ema, sma, np.maximum(ema, sma), np.minimum(ema, sma)
+
 class BandStrategy:
     def __init__(self, 
                  position_size_usd: float = 100,
@@ -18,23 +53,108 @@ class BandStrategy:
         self.tp_multiplier = tp_multiplier
         self.sl_multiplier = sl_multiplier
         self.active_position = None
-        self.last_signal_candle = None
+        self.last_signal_ts: Optional[int] = None  # signal candle open time, ns since epoch
         self.pending_signal = None
 
+        # Streaming indicator state, seeded by calculate_band_arrays on backfill
+        self._ema34_state: Optional[float] = None
+        self._sma21_buffer = deque(maxlen=SMA_WINDOW)
+        self._sma21_sum = 0.0
+        self._updates_since_resum = 0
+        # What the newest close changed, so retract_indicators can take it back
+        self._prev_ema34_state: Optional[float] = None
+        self._sma21_dropped: Optional[float] = None
+
+    @property
+    def last_signal_candle(self) -> Optional[pd.Timestamp]:
+        """Open time of the candle that produced the pending signal."""
+        return pd.Timestamp(self.last_signal_ts) if self.last_signal_ts is not None else None
+
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculate SMA 21 and EMA 34 indicators."""
-        if df.empty:
+        if len(df) == 0:
             return df
 
-        df['EMA34'] = df['close'].ewm(span=34, adjust=False).mean()
-        df['SMA21'] = df['close'].rolling(window=21).mean()
+        ema, sma, upper, lower = self.calculate_band_arrays(df['close'].to_numpy(dtype=np.float64))
 
         # Calculate upper and lower bands
-        df['upper_band'] = df[['EMA34', 'SMA21']].max(axis=1)
-        df['lower_band'] = df[['EMA34', 'SMA21']].min(axis=1)
+        df['EMA34'] = ema
+        df['SMA21'] = sma
+        df['upper_band'] = upper
+        df['lower_band'] = lower
 
         return df.dropna()
 
+    def calculate_band_arrays(self, close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Array counterpart of calculate_indicators for the candle buffer's backfill: returns the
+        (EMA34, SMA21, upper_band, lower_band) arrays, with the 20-candle SMA warm-up left as NaN rather than dropped.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        ema, sma, upper, lower = band_indicators(close)
+        n = len(close)
+        if not n:
+            return ema, sma, upper, lower
+
+        # Seed the streaming state so later candles can go through update_indicators,
+        # with the newest close retractable as if it had arrived that way
+        self._ema34_state = float(ema[-1])
+        self._prev_ema34_state = float(ema[-2]) if n > 1 else None
+        self._sma21_buffer = deque(close[-SMA_WINDOW:].tolist(), maxlen=SMA_WINDOW)
+        self._sma21_sum = sum(self._sma21_buffer)
+        self._sma21_dropped = float(close[-SMA_WINDOW - 1]) if n > SMA_WINDOW else None
+        self._updates_since_resum = 0
+
+        return ema, sma, upper, lower
+
+    def update_indicators(self, new_close: float) -> Tuple[float, float, float, float]:
+        """
+        Advance EMA 34 and SMA 21 by one closed candle in O(1).
+        Returns (EMA34, SMA21, upper_band, lower_band); SMA21 and the bands are NaN until 21 closes are known.
+        """
+        new_close = float(new_close)
+        self._prev_ema34_state = self._ema34_state
+        if self._ema34_state is None:
+            self._ema34_state = new_close
+        else:
+            self._ema34_state += EMA34_ALPHA * (new_close - self._ema34_state)
+
+        buffer = self._sma21_buffer
+        if len(buffer) == buffer.maxlen:
+            self._sma21_dropped = buffer[0]
+            self._sma21_sum -= buffer[0]
+        else:
+            self._sma21_dropped = None
+        buffer.append(new_close)
+        self._sma21_sum += new_close
+
+        self._updates_since_resum += 1
+        if self._updates_since_resum >= SMA_RESUM_INTERVAL:
+            self._sma21_sum = sum(buffer)
+            self._updates_since_resum = 0
+
+        ema = self._ema34_state
+        if len(buffer) < buffer.maxlen:
+            nan = float('nan')
+            return ema, nan, nan, nan
+
+        sma = self._sma21_sum / buffer.maxlen
+        return ema, sma, max(ema, sma), min(ema, sma)
+
+    def retract_indicators(self) -> None:
+        """
+        Undo the last update_indicators call (or the newest close of calculate_band_arrays),
+        so a candle that was still open can be fed again with its final close. Only one step can be undone.
+        """
+        self._ema34_state = self._prev_ema34_state
+        buffer = self._sma21_buffer
+        if buffer:
+            self._sma21_sum -= buffer.pop()
+        if self._sma21_dropped is not None:
+            buffer.appendleft(self._sma21_dropped)
+            self._sma21_sum += self._sma21_dropped
+            self._sma21_dropped = None
+
     def get_signal(self, df: pd.DataFrame) -> Optional[str]:
         """
         Generate trading signal based on price position relative to bands.
@@ -43,62 +163,88 @@ class BandStrategy:
         if len(df) < 2:  # Need at least previous and current candle
             return None
 
-        # Get the last two candles
-        current = df.iloc[-1]
-        prev = df.iloc[-2]
-
-        # Enhanced logging for signal analysis
-        logger.info("\n=== Signal Analysis ===")
-        logger.info(f"Previous Candle Time: {prev.name}")
-        logger.info(f"Previous Close: ${prev['close']:.4f}")
-        logger.info(f"Previous Upper Band: ${prev['upper_band']:.4f}")
-        logger.info(f"Previous Lower Band: ${prev['lower_band']:.4f}")
-        logger.info(f"Distance from Upper: ${(prev['upper_band'] - prev['close']):.4f}")
-        logger.info(f"Distance from Lower: ${(prev['close'] - prev['lower_band']):.4f}")
-        logger.info(f"Outside Bands: {'Above' if prev['close'] > prev['upper_band'] else 'Below' if prev['close'] < prev['lower_band'] else 'No'}")
-
-        logger.info(f"\nCurrent Candle Time: {current.name}")
-        logger.info(f"Has Pending Signal: {self.pending_signal is not None}")
-        if self.last_signal_candle:
-            logger.info(f"Last Signal Time: {self.last_signal_candle}")
+        # Pull the last two candles straight from the column arrays
+        close = df['close'].to_numpy()
+        upper = df['upper_band'].to_numpy()
+        lower = df['lower_band'].to_numpy()
+        prev_close, prev_upper, prev_lower = close[-2], upper[-2], lower[-2]
+        prev_time, current_candle_time = df.index[-2], df.index[-1]
+        prev_ts, current_ts = prev_time.value, current_candle_time.value
+
+        # Enhanced logging for signal analysis, skipped entirely unless INFO is enabled
+        log_info = logger.isEnabledFor(logging.INFO)
+        if log_info:
+            logger.info("\n=== Signal Analysis ===")
+            logger.info("Previous Candle Time: %s", prev_time)
+            logger.info("Previous Close: $%.4f", prev_close)
+            logger.info("Previous Upper Band: $%.4f", prev_upper)
+            logger.info("Previous Lower Band: $%.4f", prev_lower)
+            logger.info("Distance from Upper: $%.4f", prev_upper - prev_close)
+            logger.info("Distance from Lower: $%.4f", prev_close - prev_lower)
+            logger.info("Outside Bands: %s", 'Above' if prev_close > prev_upper else 'Below' if prev_close < prev_lower else 'No')
+
+            logger.info("\nCurrent Candle Time: %s", current_candle_time)
+            logger.info("Has Pending Signal: %s", self.pending_signal is not None)
+            if self.last_signal_ts is not None:
+                logger.info("Last Signal Time: %s", self.last_signal_candle)
 
         # Check if current candle is exactly the next one after signal
-        if self.pending_signal and self.last_signal_candle:
-            expected_next_candle = self.last_signal_candle + timedelta(minutes=5)  # 5-minute timeframe
-            current_time = current.name.to_pydatetime()
+        if self.pending_signal and self.last_signal_ts is not None:
+            expected_next_ts = self.last_signal_ts + CANDLE_INTERVAL_NS
 
-            logger.info(f"\n=== Execution Check ===")
-            logger.info(f"Current candle time: {current_time}")
-            logger.info(f"Expected next candle: {expected_next_candle}")
+            if log_info:
+                logger.info("\n=== Execution Check ===")
+                logger.info("Current candle time: %s", current_candle_time)
+                logger.info("Expected next candle: %s", pd.Timestamp(expected_next_ts))
 
-            if current_time == expected_next_candle:
-                logger.info(f">>> EXECUTING {self.pending_signal.upper()} signal now!")
+            if current_ts == expected_next_ts:
+                logger.info(">>> EXECUTING %s signal now!", self.pending_signal.upper())
                 signal = self.pending_signal
                 self.pending_signal = None
-                self.last_signal_candle = None
+                self.last_signal_ts = None
                 return signal
-            elif current_time > expected_next_candle:
+            elif current_ts > expected_next_ts:
                 logger.info("Missed execution window, discarding signal")
                 self.pending_signal = None
-                self.last_signal_candle = None
+                self.last_signal_ts = None
             return None
 
         # Check if the previous candle closed outside the bands
-        prev_above_bands = prev['close'] > prev['upper_band']
-        prev_below_bands = prev['close'] < prev['lower_band']
+        prev_above_bands = prev_close > prev_upper
+        prev_below_bands = prev_close < prev_lower
 
         # Generate new signal if previous candle closed outside bands
         if prev_above_bands or prev_below_bands:
             self.pending_signal = 'long' if prev_above_bands else 'short'
-            self.last_signal_candle = prev.name.to_pydatetime()
-            logger.info(f"\n!!! New {self.pending_signal.upper()} signal generated !!!")
-            logger.info(f"Signal Time: {self.last_signal_candle}")
-            logger.info(f"Signal Price: ${prev['close']:.4f}")
-            logger.info(f"Band Distance: ${abs(prev['upper_band'] - prev['lower_band']):.4f}")
-            logger.info(f"Will execute at the start of {self.last_signal_candle + timedelta(minutes=5)}")
+            self.last_signal_ts = prev_ts
+            if log_info:
+                logger.info("\n!!! New %s signal generated !!!", self.pending_signal.upper())
+                logger.info("Signal Time: %s", self.last_signal_candle)
+                logger.info("Signal Price: $%.4f", prev_close)
+                logger.info("Band Distance: $%.4f", abs(prev_upper - prev_lower))
+                logger.info("Will execute at the start of %s", pd.Timestamp(prev_ts + CANDLE_INTERVAL_NS))
 
         return None
 
+    def get_signals_vectorized(self, df: pd.DataFrame) -> Tuple[np.ndarray, pd.Index]:
+        """
+        Compute signals for every candle at once, for backtests and historical catch-up.
+        A candle is marked 1 (long) or -1 (short) when the previous candle closed above
+        or below the bands, i.e. the candle the signal would be executed on.
+        Unlike get_signal this is stateless and does not touch the pending signal.
+        """
+        close = df['close'].to_numpy()
+        upper = df['upper_band'].to_numpy()
+        lower = df['lower_band'].to_numpy()
+
+        prev_above = np.zeros(len(close), dtype=bool)
+        prev_below = np.zeros(len(close), dtype=bool)
+        prev_above[1:] = close[:-1] > upper[:-1]
+        prev_below[1:] = close[:-1] < lower[:-1]
+
+        signals = np.where(prev_above, 1, np.where(prev_below, -1, 0)).astype(np.int8)
+        return signals, df.index
+
     def calculate_entry_levels(self, 
                              current_price: float, 
                              bands: Dict[str, float], 
@@ -145,15 +291,15 @@ class BandStrategy:
         if not position:
             return False
         
-        latest = df.iloc[-1]
+        latest_close = df['close'].to_numpy()[-1]
         is_long = position['side'] == 'buy'
         
         # Close long if price crosses below bands
-        if is_long and latest['close'] < min(latest['EMA34'], latest['SMA21']):
+        if is_long and latest_close < df['lower_band'].to_numpy()[-1]:
             return True
         
         # Close short if price crosses above bands
-        if not is_long and latest['close'] > max(latest['EMA34'], latest['SMA21']):
+        if not is_long and latest_close > df['upper_band'].to_numpy()[-1]:
             return True
         
         return False
\ No newline at end of file
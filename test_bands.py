@@ -1,5 +1,6 @@
 import os
 import logging
+import numpy as np
 import pandas as pd
 from blofin_api import BlofinAPI
 import json
@@ -18,7 +19,7 @@ def load_config():
         with open('config.json', 'r') as f:
             return json.load(f)
     except Exception as e:
-        logger.error(f"Failed to load config: {str(e)}")
+        logger.error("Failed to load config: %s", e)
         raise
 
 def calculate_bands(df):
@@ -28,27 +29,35 @@ def calculate_bands(df):
         df['EMA34'] = df['close'].ewm(span=34, adjust=False).mean()
         df['SMA21'] = df['close'].rolling(window=21).mean()
 
+        # Derive the bands for the whole frame at once (fmax/fmin fall back to EMA34 while SMA21 is warming up)
+        ema = df['EMA34'].to_numpy()
+        sma = df['SMA21'].to_numpy()
+        df['upper_band'] = np.fmax(ema, sma)
+        df['lower_band'] = np.fmin(ema, sma)
+
         # Log band calculation details for verification
-        last_row = df.iloc[-1]
-        logger.info(f"Latest calculations:")
-        logger.info(f"Close price: ${last_row['close']:.4f}")
-        logger.info(f"EMA34: ${last_row['EMA34']:.4f}")
-        logger.info(f"SMA21: ${last_row['SMA21']:.4f}")
+        if logger.isEnabledFor(logging.INFO):
+            last_row = df.iloc[-1]
+            logger.info("Latest calculations:")
+            logger.info("Close price: $%.4f", last_row['close'])
+            logger.info("EMA34: $%.4f", last_row['EMA34'])
+            logger.info("SMA21: $%.4f", last_row['SMA21'])
 
         return df
     except Exception as e:
-        logger.error(f"Failed to calculate bands: {str(e)}")
+        logger.error("Failed to calculate bands: %s", e)
         raise
 
 def analyze_market_conditions(df):
     """Analyze current market conditions based on band positions"""
     try:
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
+        close = df['close'].to_numpy()
+        upper = df['upper_band'].to_numpy()
+        lower = df['lower_band'].to_numpy()
 
-        upper_band = max(latest['EMA34'], latest['SMA21'])
-        lower_band = min(latest['EMA34'], latest['SMA21'])
-        current_price = latest['close']
+        upper_band = upper[-1]
+        lower_band = lower[-1]
+        current_price = close[-1]
 
         # Determine market condition
         if current_price > upper_band:
@@ -59,9 +68,9 @@ def analyze_market_conditions(df):
             condition = "BETWEEN_BANDS"
 
         # Check for crossovers
-        prev_upper = max(prev['EMA34'], prev['SMA21'])
-        prev_lower = min(prev['EMA34'], prev['SMA21'])
-        prev_price = prev['close']
+        prev_upper = upper[-2]
+        prev_lower = lower[-2]
+        prev_price = close[-2]
 
         crossover = None
         if prev_price <= prev_upper and current_price > upper_band:
@@ -80,7 +89,7 @@ def analyze_market_conditions(df):
             'price_to_lower': current_price - lower_band
         }
     except Exception as e:
-        logger.error(f"Failed to analyze market conditions: {str(e)}")
+        logger.error("Failed to analyze market conditions: %s", e)
         raise
 
 def main():
@@ -95,15 +104,15 @@ def main():
         api_passphrase = os.getenv('BLOFIN_API_PASSPHRASE')
 
         logger.debug("Checking API credentials...")
-        logger.debug(f"API Key present: {bool(api_key)}")
-        logger.debug(f"API Secret present: {bool(api_secret)}")
-        logger.debug(f"API Passphrase present: {bool(api_passphrase)}")
+        logger.debug("API Key present: %s", bool(api_key))
+        logger.debug("API Secret present: %s", bool(api_secret))
+        logger.debug("API Passphrase present: %s", bool(api_passphrase))
 
         if not all([api_key, api_secret, api_passphrase]):
             logger.error("Missing API credentials")
             return
 
-        logger.debug(f"Using base URL: {config['base_url']}")
+        logger.debug("Using base URL: %s", config['base_url'])
         api = BlofinAPI(
             api_key=api_key,
             api_secret=api_secret,
@@ -113,7 +122,7 @@ def main():
 
         # Fetch OHLCV data for XRP-USDT
         symbol = "XRP-USDT"  # Changed from BTC-USDT to XRP-USDT
-        logger.info(f"Fetching OHLCV data for {symbol}")
+        logger.info("Fetching OHLCV data for %s", symbol)
 
         try:
             response = api._request(
@@ -125,62 +134,74 @@ def main():
                     'limit': '300'
                 }
             )
-            logger.debug(f"API Response Status: {bool(response)}")
+            logger.debug("API Response Status: %s", bool(response))
         except Exception as e:
-            logger.error(f"API request failed: {str(e)}")
+            logger.error("API request failed: %s", e)
             return
 
         if not response or 'data' not in response:
-            logger.error(f"Invalid API response format: {response}")
+            logger.error("Invalid API response format: %s", response)
             return
 
-        # Convert to DataFrame with proper timestamp handling
-        columns = ['timestamp', 'open', 'high', 'low', 'close', 'vol', 'volCurrency', 'volCurrencyQuote', 'confirm']
-        df = pd.DataFrame(response['data'], columns=columns)
-
-        # Convert timestamp to datetime and set as index
-        df['timestamp'] = pd.to_datetime(pd.to_numeric(df['timestamp']), unit='ms')
-        df.set_index('timestamp', inplace=True)
-        df.sort_index(inplace=True)
-
-        # Convert price columns to numeric
-        for col in ['open', 'high', 'low', 'close']:
-            df[col] = pd.to_numeric(df[col])
+        # Walk the rows once, casting straight into preallocated typed columns
+        rows = response['data']
+        n = len(rows)
+        ts = np.empty(n, dtype=np.int64)
+        o = np.empty(n)
+        h = np.empty(n)
+        l = np.empty(n)
+        c = np.empty(n)
+        for i, r in enumerate(rows):
+            ts[i] = int(r[0])
+            o[i] = float(r[1])
+            h[i] = float(r[2])
+            l[i] = float(r[3])
+            c[i] = float(r[4])
+
+        df = pd.DataFrame(
+            {'open': o, 'high': h, 'low': l, 'close': c},
+            index=pd.DatetimeIndex(pd.to_datetime(ts, unit='ms'), name='timestamp')
+        )
+        # Blofin returns candles newest first, so a reversal is usually all the ordering needed
+        if not df.index.is_monotonic_increasing:
+            df = df.iloc[::-1] if df.index.is_monotonic_decreasing else df.sort_index()
 
-        logger.info(f"Successfully loaded {len(df)} candles")
+        logger.info("Successfully loaded %d candles", len(df))
 
         # Calculate bands
         df = calculate_bands(df)
 
         # Print the last few candles with bands (showing more recent ones)
         last_rows = df.tail(10)  # Show last 10 candles instead of 5
-        logger.info("\nLast 10 candles with bands:")
-        for idx, row in last_rows.iterrows():
-            logger.info(
-                f"Time: {idx.strftime('%Y-%m-%d %H:%M:%S')}, "  # Include seconds in timestamp
-                f"Close: ${row['close']:.4f}, "
-                f"EMA34: ${row['EMA34']:.4f}, "
-                f"SMA21: ${row['SMA21']:.4f}"
-            )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("\nLast 10 candles with bands:")
+            for idx, row in last_rows.iterrows():
+                logger.info(
+                    "Time: %s, Close: $%.4f, EMA34: $%.4f, SMA21: $%.4f",
+                    idx.strftime('%Y-%m-%d %H:%M:%S'),  # Include seconds in timestamp
+                    row['close'],
+                    row['EMA34'],
+                    row['SMA21']
+                )
 
         # Analyze market conditions
         analysis = analyze_market_conditions(df)
 
         logger.info("\nCurrent Market Analysis:")
-        logger.info(f"Time: {df.index[-1].strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"Price: ${analysis['current_price']:.4f}")
-        logger.info(f"Upper band: ${analysis['upper_band']:.4f}")
-        logger.info(f"Lower band: ${analysis['lower_band']:.4f}")
-        logger.info(f"Band distance: ${analysis['band_distance']:.4f}")
-        logger.info(f"Distance to upper: ${analysis['price_to_upper']:.4f}")
-        logger.info(f"Distance to lower: ${analysis['price_to_lower']:.4f}")
-        logger.info(f"Market condition: {analysis['condition']}")
+        logger.info("Time: %s", df.index[-1].strftime('%Y-%m-%d %H:%M:%S'))
+        logger.info("Price: $%.4f", analysis['current_price'])
+        logger.info("Upper band: $%.4f", analysis['upper_band'])
+        logger.info("Lower band: $%.4f", analysis['lower_band'])
+        logger.info("Band distance: $%.4f", analysis['band_distance'])
+        logger.info("Distance to upper: $%.4f", analysis['price_to_upper'])
+        logger.info("Distance to lower: $%.4f", analysis['price_to_lower'])
+        logger.info("Market condition: %s", analysis['condition'])
         if analysis['crossover']:
-            logger.info(f"Signal: {analysis['crossover']}")
+            logger.info("Signal: %s", analysis['crossover'])
 
     except Exception as e:
-        logger.error(f"Error: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
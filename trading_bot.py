@@ -1,23 +1,76 @@
 import os
+import asyncio
+import atexit
 import logging
+import queue
 import time
-from typing import Dict, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
 import pandas as pd
 from datetime import datetime
 from strategy import BandStrategy
-from blofin_api import BlofinAPI
+from blofin_api import AsyncBlofinAPI
+from blofin_ws import BlofinWSClient
+from utils import CandleBuffer
+
+# Configure logging: callers only enqueue records, a listener thread does the console/file I/O
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.StreamHandler(),
+    logging.FileHandler('trading_bot.log')
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# The queue handler only renders the message; the listener's handlers add the timestamp and level
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 
-# Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('trading_bot.log')
-    ]
+    handlers=[_queue_handler]
 )
 logger = logging.getLogger(__name__)
 
+# 5-minute candles, in seconds
+CANDLE_PERIOD = 5 * 60
+
+# Fall back to REST if no candle arrives over the WebSocket this many seconds after a boundary
+WS_CANDLE_GRACE = 30
+
+# Candle spacing in ms, matching the timestamps Blofin sends
+CANDLE_INTERVAL_MS = CANDLE_PERIOD * 1000
+
+# Seconds to wait after an empty or failed candle fetch, doubling per consecutive miss
+EMPTY_FETCH_BACKOFF = 10.0
+MAX_EMPTY_FETCH_BACKOFF = 300.0
+
+# Seconds to pause after an error in the main loop, doubling per consecutive error
+ERROR_BACKOFF = 60.0
+MAX_ERROR_BACKOFF = 300.0
+
+# Candles turned into a DataFrame each tick: two for the signal, three for the log
+TAIL_CANDLES = 3
+
+# Order call with the bot's fixed symbol, side and leverage inlined as literals
+_PLACE_ORDER_TEMPLATE = '''
+def place(api, size, tp, sl):
+    return api.place_order(symbol={symbol!r}, side={side!r}, size=size,
+                           take_profit=tp, stop_loss=sl, leverage={leverage!r})
+'''
+
+def _order_placer(symbol: str, side: str, leverage: int):
+    """Build place(api, size, tp, sl) for one symbol/side/leverage, so an order call only passes what varies."""
+    namespace = {}
+    # repr() of a str/int is a plain literal, so the generated source can't run anything else
+    exec(_PLACE_ORDER_TEMPLATE.format(symbol=str(symbol), side=side, leverage=int(leverage)), namespace)
+    return namespace['place']
+
 class TradingBot:
     def __init__(self,
                  symbol: str = "BTC-USDT",
@@ -26,9 +79,10 @@ class TradingBot:
                  tp_multiplier: float = 2.0,
                  sl_multiplier: float = 1.0):
         """Initialize the trading bot with configuration."""
-        logger.info(f"Initializing trading bot for {symbol}")
+        logger.info("Initializing trading bot for %s", symbol)
         self.symbol = symbol
-        self.api = BlofinAPI(
+        # One aiohttp session for the bot's lifetime keeps the TLS connection alive between candles
+        self.api = AsyncBlofinAPI(
             api_key=os.getenv('BLOFIN_API_KEY'),
             api_secret=os.getenv('BLOFIN_SECRET_KEY'),
             password=os.getenv('BLOFIN_API_PASSPHRASE'),
@@ -40,14 +94,32 @@ class TradingBot:
             tp_multiplier=tp_multiplier,
             sl_multiplier=sl_multiplier
         )
+        self.ws = BlofinWSClient(symbol, channel="candle5m")
+        # Symbol and leverage are fixed for the bot's lifetime, so specialize the order call per side once
+        self._place_long = _order_placer(symbol, "buy", leverage)
+        self._place_short = _order_placer(symbol, "sell", leverage)
+        self.candles = CandleBuffer(self.strategy, size=300)
+        self._trade_tasks = set()  # in-flight order tasks, awaited on shutdown
+        # Negative cache for candle fetches: skip REST until _empty_until (monotonic) after an empty/failed one
+        self._empty_until = 0.0
+        self._backoff = EMPTY_FETCH_BACKOFF
+        self._err_backoff = ERROR_BACKOFF  # pause after a main loop error, doubling while errors repeat
         self.running = False
         logger.info("Trading bot initialized successfully")
 
-    def fetch_ohlcv(self) -> pd.DataFrame:
-        """Fetch recent OHLCV data for analysis."""
+    async def fetch_candles(self) -> Optional[List[List[str]]]:
+        """
+        Fetch the raw candle rows over REST, used for the initial backfill.
+        After an empty or failed fetch, further calls return None without a request until the backoff expires.
+        """
+        now = time.monotonic()
+        if now < self._empty_until:
+            logger.debug("Skipping candle fetch for %s, retrying in %.0fs", self.symbol, self._empty_until - now)
+            return None
+
+        logger.debug("Fetching OHLCV data for %s", self.symbol)
         try:
-            logger.debug(f"Fetching OHLCV data for {self.symbol}")
-            response = self.api._request(
+            response = await self.api._request(
                 'GET',
                 '/api/v1/market/candles',
                 params={
@@ -56,54 +128,88 @@ class TradingBot:
                     'limit': '300'
                 }
             )
-
-            if not response or 'data' not in response:
-                logger.error("Invalid API response format")
+        except Exception:
+            self._defer_candle_fetch()
+            raise
+
+        if not response or 'data' not in response:
+            logger.error("Invalid API response format")
+            self._defer_candle_fetch()
+            return None
+
+        if not response['data']:
+            self._defer_candle_fetch()
+            return None
+
+        self._backoff = EMPTY_FETCH_BACKOFF
+        return response['data']
+
+    def _defer_candle_fetch(self) -> None:
+        """Hold off REST candle fetches, doubling the wait on each consecutive miss."""
+        self._empty_until = time.monotonic() + self._backoff
+        logger.warning("No candle data for %s, next REST fetch in %.0fs", self.symbol, self._backoff)
+        self._backoff = min(self._backoff * 2, MAX_EMPTY_FETCH_BACKOFF)
+
+    async def fetch_ohlcv(self) -> Optional[List[List[str]]]:
+        """
+        Backfill the candle window over REST: seed the WebSocket window and reload the candle buffer from it.
+        Returns the window, oldest first, or None if no candles came back.
+        """
+        try:
+            rows = await self.fetch_candles()
+        except Exception as e:
+            logger.error("Error fetching OHLCV data: %s", e)
+            return None
+        if not rows:
+            return None
+
+        self.ws.seed(rows)
+        rows = list(self.ws.candles)
+        self.candles.load(rows)
+        logger.debug("Retrieved %d candles", self.candles.count)
+        return rows
+
+    async def update_candles(self, rows: List[List[str]]) -> pd.DataFrame:
+        """
+        Merge the newest candle rows into the candle buffer and return its last few candles with bands.
+        Rows that don't continue the buffer (empty buffer, candles missed across a WebSocket reconnect)
+        trigger a REST backfill instead: the WebSocket window can have gaps, a REST snapshot can't.
+        """
+        try:
+            if not self.candles.update(rows, CANDLE_INTERVAL_MS) and not await self.fetch_ohlcv():
                 return pd.DataFrame()
 
-            # Convert to DataFrame
-            columns = ['timestamp', 'open', 'high', 'low', 'close', 'vol', 'volCurrency', 'volCurrencyQuote', 'confirm']
-            df = pd.DataFrame(response['data'], columns=columns)
-
-            # Convert timestamp to datetime and set as index
-            df['timestamp'] = pd.to_datetime(pd.to_numeric(df['timestamp']), unit='ms')
-            df.set_index('timestamp', inplace=True)
-            df.sort_index(inplace=True)
-
-            # Convert price columns to numeric
-            for col in ['open', 'high', 'low', 'close']:
-                df[col] = pd.to_numeric(df[col])
-
-            logger.debug(f"Retrieved {len(df)} candles")
-
-            # Calculate indicators and bands
-            df = self.strategy.calculate_indicators(df)
-
-            # Log the last few candles with band information
-            last_candles = df.tail(3)
-            logger.info("\nLast 3 candles:")
-            for idx, row in last_candles.iterrows():
-                logger.info(
-                    f"Time: {idx.strftime('%Y-%m-%d %H:%M:%S')}, "
-                    f"Close: ${row['close']:.4f}, "
-                    f"Upper: ${row['upper_band']:.4f}, "
-                    f"Lower: ${row['lower_band']:.4f}"
-                )
-
-            return df
+            df = self.candles.frame(TAIL_CANDLES)
+            self._log_last_candles(df)
+            return df.dropna()
 
         except Exception as e:
-            logger.error(f"Error fetching OHLCV data: {str(e)}")
+            logger.error("Error updating OHLCV data: %s", e)
             return pd.DataFrame()
 
-    def execute_trade(self, signal: str, current_price: float) -> bool:
-        """Execute a trade based on the signal."""
+    def _log_last_candles(self, df: pd.DataFrame) -> None:
+        """Log the last few candles with band information (DEBUG only, it runs every candle)."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
+        # Walk the column arrays directly and emit a single record
+        last_candles = df.tail(3)
+        times = last_candles.index.strftime('%Y-%m-%d %H:%M:%S')
+        lines = [
+            f"Time: {t}, Close: ${c:.4f}, Upper: ${u:.4f}, Lower: ${l:.4f}"
+            for t, c, u, l in zip(times,
+                                  last_candles['close'].to_numpy(),
+                                  last_candles['upper_band'].to_numpy(),
+                                  last_candles['lower_band'].to_numpy())
+        ]
+        logger.debug("\nLast 3 candles:\n%s", "\n".join(lines))
+
+    async def execute_trade(self, signal: str, current_price: float, df: pd.DataFrame) -> bool:
+        """Execute a trade based on the signal, using the bands of the frame the signal came from."""
         try:
-            logger.info(f"Executing {signal} trade at ${current_price:.4f}")
-            logger.info(f"Signal was generated at {self.strategy.last_signal_candle}")
+            logger.info("Executing %s trade at $%.4f", signal, current_price)
+            logger.info("Signal was generated at %s", self.strategy.last_signal_candle)
 
-            # Calculate band levels for TP/SL
-            df = self.fetch_ohlcv()
             if df.empty:
                 logger.error("Cannot execute trade: No OHLCV data available")
                 return False
@@ -127,31 +233,38 @@ class TradingBot:
             side = "buy" if is_long else "sell"
             size = self.strategy.position_size_usd / current_price
 
-            logger.info(f"Placing {side} order:")
-            logger.info(f"Entry Price: ${current_price:.4f}")
-            logger.info(f"Band Distance: ${abs(bands['upper'] - bands['lower']):.4f}")
-            logger.info(f"Size: {size:.4f}")
-            logger.info(f"Take Profit: ${tp_price:.4f}")
-            logger.info(f"Stop Loss: ${sl_price:.4f}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Placing %s order:", side)
+                logger.info("Entry Price: $%.4f", current_price)
+                logger.info("Band Distance: $%.4f", abs(bands['upper'] - bands['lower']))
+                logger.info("Size: %.4f", size)
+                logger.info("Take Profit: $%.4f", tp_price)
+                logger.info("Stop Loss: $%.4f", sl_price)
 
             # Place the order using BlofinAPI
-            order_result = self.api.place_order(
-                symbol=self.symbol,
-                side=side,
-                size=size,
-                take_profit=tp_price,
-                stop_loss=sl_price,
-                leverage=self.strategy.leverage
-            )
+            place = self._place_long if is_long else self._place_short
+            order_result = await place(self.api, size, tp_price, sl_price)
 
-            logger.info(f"Order placed successfully: {order_result}")
+            logger.info("Order placed successfully: %s", order_result)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to execute trade: {str(e)}")
+            logger.error("Failed to execute trade: %s", e)
             return False
 
-    def check_and_close_position(self) -> bool:
+    @staticmethod
+    def _next_boundary(now: float, period: int = CANDLE_PERIOD, lead: float = 2) -> float:
+        """Wall-clock time `lead` seconds before the next candle boundary (negative `lead` means after it)."""
+        return (now // period + 1) * period - lead
+
+    async def _trade(self, signal: str, current_price: float, df: pd.DataFrame) -> None:
+        """Execute a trade and log its outcome; runs as its own task so the candle loop never waits on it."""
+        if await self.execute_trade(signal, current_price, df):
+            logger.info("Trade executed successfully at $%.4f", current_price)
+        else:
+            logger.warning("Trade execution failed")
+
+    async def check_and_close_position(self) -> bool:
         """Check if current position should be closed."""
         try:
             # For now, we'll rely on the TP/SL orders set during position opening
@@ -159,70 +272,84 @@ class TradingBot:
             return False
 
         except Exception as e:
-            logger.error(f"Error checking position: {str(e)}")
+            logger.error("Error checking position: %s", e)
             return False
 
-    def run(self):
+    async def run(self):
         """Run the trading bot."""
         self.running = True
-        logger.info(f"Starting trading bot for {self.symbol}")
+        logger.info("Starting trading bot for %s", self.symbol)
         logger.info("Strategy configuration:")
-        logger.info(f"Position size: ${self.strategy.position_size_usd}")
-        logger.info(f"Leverage: {self.strategy.leverage}x")
-        logger.info(f"TP multiplier: {self.strategy.tp_multiplier}")
-        logger.info(f"SL multiplier: {self.strategy.sl_multiplier}")
+        logger.info("Position size: $%s", self.strategy.position_size_usd)
+        logger.info("Leverage: %sx", self.strategy.leverage)
+        logger.info("TP multiplier: %s", self.strategy.tp_multiplier)
+        logger.info("SL multiplier: %s", self.strategy.sl_multiplier)
 
+        ws_task = None
         try:
+            # Backfill the candle window over REST once, then follow the WebSocket
+            await self.fetch_ohlcv()
+            ws_task = asyncio.create_task(self.ws.run())
+
             while self.running:
                 try:
-                    start_time = time.time()
-
-                    # Calculate time until next 5-minute candle
-                    current_minute = start_time // 60
-                    next_candle = ((current_minute // 5) + 1) * 5 * 60
-                    wait_time = next_candle - start_time
-
-                    if wait_time > 0:
-                        logger.info(f"Waiting {wait_time:.1f} seconds for next candle")
-                        time.sleep(wait_time)
+                    # Wait for the next candle push; fall back to REST if it is late.
+                    # Boundaries are UTC-aligned so they come from time.time(); the wait itself runs on the loop's monotonic clock
+                    now = time.time()
+                    timeout = self._next_boundary(now, lead=-WS_CANDLE_GRACE) - now
+                    try:
+                        rows = await self.ws.next_candle(timeout=timeout)
+                    except asyncio.TimeoutError:
+                        logger.warning("No candle received over WebSocket, backfilling over REST")
+                        rows = await self.fetch_ohlcv()
+
+                    if not rows:
+                        logger.warning("No data available, waiting for next iteration")
+                        await asyncio.sleep(10)
+                        continue
 
-                    # Fetch latest data
-                    df = self.fetch_ohlcv()
+                    started = time.monotonic()
+                    df = await self.update_candles(rows)
                     if df.empty:
                         logger.warning("No data available, waiting for next iteration")
-                        time.sleep(10)
+                        await asyncio.sleep(10)
                         continue
 
                     # Get current price and time
-                    current_price = float(df['close'].iloc[-1])
+                    # The frame's prices are float32; order sizing uses the exact close
+                    current_price = self.candles.last_close
                     current_time = df.index[-1]
-                    logger.info(f"\nCurrent time: {current_time}")
-                    logger.info(f"Current price: ${current_price:.4f}")
+                    logger.info("\nCurrent time: %s", current_time)
+                    logger.info("Current price: $%.4f", current_price)
 
                     # Get signal and execute if conditions are met
                     signal = self.strategy.get_signal(df)
                     if signal:
-                        logger.info(f"Executing {signal} signal immediately")
-
-                        if self.execute_trade(signal, current_price):
-                            logger.info(f"Trade executed successfully at ${current_price:.4f}")
-                        else:
-                            logger.warning("Trade execution failed")
-
-                    # Sleep until just before the next candle
-                    sleep_time = max(1, 300 - (time.time() % 300) - 2)  # Wake up 2 seconds before next candle
-                    logger.info(f"Next candle check in {sleep_time:.1f} seconds")
-                    time.sleep(sleep_time)
-
-                except Exception as e:
-                    logger.error(f"Error in main loop: {str(e)}")
-                    import traceback
-                    logger.error(f"Traceback: {traceback.format_exc()}")
-                    time.sleep(60)
-
-        except KeyboardInterrupt:
-            logger.info("Stopping trading bot...")
+                        logger.info("Executing %s signal immediately", signal)
+
+                        task = asyncio.create_task(self._trade(signal, current_price, df))
+                        self._trade_tasks.add(task)
+                        task.add_done_callback(self._trade_tasks.discard)
+
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Candle processed in %.2f ms", (time.monotonic() - started) * 1000)
+
+                    self._err_backoff = ERROR_BACKOFF
+
+                except Exception:
+                    logger.exception("Error in main loop")
+                    await asyncio.sleep(self._err_backoff)
+                    self._err_backoff = min(self._err_backoff * 2, MAX_ERROR_BACKOFF)
+
+        finally:
             self.running = False
+            self.ws.stop()
+            if ws_task is not None:
+                ws_task.cancel()
+                await asyncio.gather(ws_task, return_exceptions=True)
+            # Let orders already on the wire finish before the session goes away
+            await asyncio.gather(*self._trade_tasks, return_exceptions=True)
+            await self.api.close()
 
 def main():
     """Main entry point for the trading bot."""
@@ -250,7 +377,10 @@ def main():
         sl_multiplier=args.sl_mult
     )
 
-    bot.run()
+    try:
+        asyncio.run(bot.run())
+    except KeyboardInterrupt:
+        logger.info("Stopping trading bot...")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
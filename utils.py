@@ -1,6 +1,28 @@
 import logging
-from typing import Dict
+import mmap
+import os
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Mapping, Tuple
 import json
+import orjson
+import numpy as np
+import pandas as pd
+from strategy import BandStrategy
+
+# Quote currencies accepted in symbols (the XXX-USDT suffix)
+SUPPORTED_QUOTES = frozenset({"USDT"})
+
+# validate_input messages, indexed by the bit of the failed check
+_VALIDATION_ERRORS = (
+    "Position size must be positive",
+    "Leverage must be at least 1",
+    "TP and SL percentages must be positive",
+    "Symbol must be in format XXX-USDT"
+)
+
+# CandleBuffer.frame columns: the ohlc block followed by the bands block
+_FRAME_COLUMNS = ['open', 'high', 'low', 'close', 'EMA34', 'SMA21', 'upper_band', 'lower_band']
 
 def setup_logging(level: str = "INFO") -> None:
     """Configure logging"""
@@ -9,18 +31,39 @@ def setup_logging(level: str = "INFO") -> None:
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
-def load_config(config_path: str = "config.json") -> Dict:
-    """Load configuration from JSON file"""
+def load_config(config_path: str = "config.json") -> Mapping:
+    """Load configuration from JSON file; the parsed result is reused until the file changes"""
     try:
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        return _load_config_cached(config_path, os.stat(config_path).st_mtime_ns)
     except FileNotFoundError:
         logging.error(f"Configuration file not found: {config_path}")
         raise
     except json.JSONDecodeError:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
         logging.error(f"Invalid JSON in configuration file: {config_path}")
         raise
 
+@lru_cache(maxsize=4)
+def _load_config_cached(config_path: str, mtime_ns: int) -> Mapping:
+    """Parse a config file version; mtime_ns is only part of the cache key"""
+    with open(config_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _freeze(orjson.loads(b''))  # mmap can't map an empty file; let orjson raise
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return _freeze(orjson.loads(view))
+            finally:
+                view.release()
+
+def _freeze(value):
+    """Read-only copy of parsed JSON, so callers can't mutate the cached config"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 def validate_input(
     symbol: str,
     position_size: float,
@@ -29,14 +72,122 @@ def validate_input(
     sl_percentage: float
 ) -> None:
     """Validate user input parameters"""
-    if position_size <= 0:
-        raise ValueError("Position size must be positive")
-    
-    if leverage < 1:
-        raise ValueError("Leverage must be at least 1")
-    
-    if tp_percentage <= 0 or sl_percentage <= 0:
-        raise ValueError("TP and SL percentages must be positive")
-    
-    if not symbol.endswith("-USDT"):
-        raise ValueError("Symbol must be in format XXX-USDT")
+    position_size = float(position_size)
+    tp_percentage = float(tp_percentage)
+    sl_percentage = float(sl_percentage)
+    _, sep, quote = symbol.rpartition("-")
+
+    # One bit per failed check, in the order they are reported
+    err = ((position_size <= 0)
+           | (leverage < 1) << 1
+           | (tp_percentage <= 0 or sl_percentage <= 0) << 2
+           | (not sep or quote not in SUPPORTED_QUOTES) << 3)
+    if not err:
+        return
+
+    raise ValueError(_VALIDATION_ERRORS[(err & -err).bit_length() - 1])
+
+class CandleBuffer:
+    """
+    Fixed-size ring buffer of candles (open/high/low/close as float32) and their float64 bands.
+    float32 keeps ~7 significant digits, plenty for band math; the exact newest close is kept as last_close.
+    The bands come from the strategy: calculate_band_arrays on load, then update_indicators per new candle.
+    A DataFrame is built only for the few rows a caller asks for.
+    """
+
+    def __init__(self, strategy: BandStrategy, size: int = 300):
+        self.strategy = strategy
+        self.size = size
+        self.timestamps = np.zeros(size, dtype=np.int64)  # open time, ms
+        self.ohlc = np.zeros((size, 4), dtype=np.float32)
+        self.bands = np.full((size, 4), np.nan)  # EMA34, SMA21, upper, lower
+        self.head = 0  # slot the next candle goes into
+        self.count = 0
+        self.last_close = float('nan')  # newest close at full precision, for order sizing
+
+    @staticmethod
+    def parse_rows(rows: List[List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Parse raw Blofin candle rows into (timestamps, ohlc) arrays, oldest first."""
+        # Two typed casts straight from the strings; timestamps stay exact int64 ms
+        timestamps = np.array([row[0] for row in rows], dtype=np.int64)
+        ohlc = np.array([row[1:5] for row in rows], dtype=np.float64).reshape(-1, 4)
+        # WebSocket rows arrive oldest first and REST rows newest first; only anything else needs a real sort
+        if len(timestamps) > 1:
+            steps = np.diff(timestamps)
+            if (steps < 0).all():
+                timestamps, ohlc = timestamps[::-1], ohlc[::-1]
+            elif not (steps > 0).all():
+                order = np.argsort(timestamps, kind='stable')
+                timestamps, ohlc = timestamps[order], ohlc[order]
+        return timestamps, ohlc
+
+    @property
+    def last_ts(self) -> int:
+        """Open time (ms) of the newest candle."""
+        return int(self.timestamps[(self.head - 1) % self.size])
+
+    def _slots(self, count: int) -> np.ndarray:
+        """Slots of the newest `count` candles, oldest first."""
+        return np.arange(self.head - count, self.head) % self.size
+
+    def load(self, rows: List[List[str]]) -> None:
+        """Replace the contents with a full window of candle rows and compute its bands."""
+        timestamps, ohlc = self.parse_rows(rows)
+        timestamps, ohlc = timestamps[-self.size:], ohlc[-self.size:]
+        n = len(timestamps)
+
+        self.timestamps[:n] = timestamps
+        self.ohlc[:n] = ohlc
+        self.bands[:] = np.nan
+        self.bands[:n] = np.column_stack(self.strategy.calculate_band_arrays(self.ohlc[:n, 3]))
+        self.last_close = float(ohlc[-1, 3]) if n else float('nan')
+        self.head = n % self.size
+        self.count = n
+
+    def update(self, rows: List[List[str]], interval_ms: int) -> bool:
+        """
+        Merge the newest candle rows into the buffer. The newest buffered candle was still open,
+        so it is overwritten along with appending the candles after it.
+        Returns False when the rows don't continue the buffer and it should be reloaded instead.
+        """
+        if not self.count:
+            return False
+
+        last_ts = self.last_ts
+        tail = [row for row in rows if int(row[0]) >= last_ts]
+        if not tail:
+            return False
+        timestamps, ohlc = self.parse_rows(tail)
+        expected = np.arange(last_ts, last_ts + len(timestamps) * interval_ms, interval_ms)
+        if len(timestamps) > self.size or not np.array_equal(timestamps, expected):
+            return False
+
+        self._retract()
+        for ts, candle in zip(timestamps.tolist(), ohlc):
+            self._append(ts, candle)
+        return True
+
+    def _retract(self) -> None:
+        """Drop the newest candle and take it back out of the strategy's indicators."""
+        slot = (self.head - 1) % self.size
+        self.strategy.retract_indicators()
+        self.head = slot
+        self.count -= 1
+
+    def _append(self, ts: int, candle: np.ndarray) -> None:
+        """Write one candle into the next slot and compute its bands."""
+        slot = self.head
+        self.timestamps[slot] = ts
+        self.ohlc[slot] = candle
+        self.last_close = float(candle[3])
+        self.head = (slot + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        # Feed the stored float32 close, so streamed bands match a reload of the same buffer
+        self.bands[slot] = self.strategy.update_indicators(float(self.ohlc[slot, 3]))
+
+    def frame(self, count: int) -> pd.DataFrame:
+        """DataFrame of the newest `count` candles, laid out like BandStrategy.calculate_indicators output."""
+        slots = self._slots(min(count, self.count))
+        index = pd.DatetimeIndex(self.timestamps[slots].astype('datetime64[ms]').astype('datetime64[ns]'), name='timestamp')
+        # One float64 block for all eight columns instead of eight Series for pandas to consolidate
+        return pd.DataFrame(np.hstack((self.ohlc[slots], self.bands[slots])), columns=_FRAME_COLUMNS, index=index)